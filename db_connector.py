@@ -1,17 +1,120 @@
 # db_connector.py
 
+import decimal
+import io
+import locale
 import logging
 import subprocess
 import os
+import re
+import tempfile
+import threading
+import uuid
+from typing import Any, Dict, Iterator, Optional
+
+# Logging is configured by the application (main.py); this module only logs
+logger = logging.getLogger(__name__)
+
+# Read sqlplus output through a 1 MiB buffer; large result sets are read in
+# fewer, bigger chunks from the pipe.
+SQLPLUS_PIPE_BUFFER_SIZE = 1 << 20
+
+# Seconds to wait for sqlplus to log off after EXIT before killing it
+SQLPLUS_EXIT_TIMEOUT = 10
+
+# SQL*Plus commands to format output as CSV with headers, sent once per session
+# SET MARKUP CSV ON is for Oracle 12.2+
+# SET PAGESIZE 0: No pagination
+# SET FEEDBACK OFF: No "X rows selected" message
+# SET HEADING ON: Keep column headers (needed for CSV parsing)
+# SET TERMOUT ON, SET TRIMSPOOL ON: Standard for clean output
+# LINESIZE 32767: Max line size to prevent wrapping
+SQLPLUS_SESSION_SETTINGS = [
+    "SET PAGESIZE 0",
+    "SET FEEDBACK OFF",
+    "SET HEADING ON",
+    "SET TERMOUT ON",
+    "SET TRIMSPOOL ON",
+    "SET LINESIZE 32767",
+    "SET MARKUP CSV ON", # Crucial for CSV output
+    "SET DEFINE OFF", # '&' in literals or bind values must not trigger substitution prompts
+    "SET SQLBLANKLINES ON", # Blank lines inside a query must not end it early
+]
+
+# Statements SQL*Plus reads as PL/SQL: ';' does not end them, only a '/' line does
+_PLSQL_BLOCK_RE = re.compile(
+    r'\s*(DECLARE|BEGIN|CREATE\s+(OR\s+REPLACE\s+)?(PROCEDURE|FUNCTION|PACKAGE|TRIGGER|TYPE))\b',
+    re.IGNORECASE
+)
+
+
+def _terminate_statement(query: str) -> str:
+    """
+    Ends a single SQL statement or PL/SQL block with a '/' line, which makes SQL*Plus
+    run it in every case. A statement SQL*Plus is still waiting on would swallow the
+    end-of-query PROMPT, and the session would hang waiting for output.
+
+    Args:
+        query (str): The statement, with or without a trailing ';' or '/' line.
+
+    Returns:
+        str: The statement followed by a '/' line, newline-terminated.
+
+    Raises:
+        ValueError: If the query is empty or holds a '/' line before its end, which
+                    would run part of it early.
+    """
+    lines = query.strip().splitlines()
+    if lines and lines[-1].strip() == '/':
+        lines.pop()
+    if any(line.strip() == '/' for line in lines):
+        raise ValueError("Query must be a single statement; it contains a '/' line before its end.")
+    statement = "\n".join(lines).rstrip()
+    if not _PLSQL_BLOCK_RE.match(statement):
+        # For SQL, '/' runs the buffer; a trailing ';' would be sent to Oracle as part of it
+        statement = statement.removesuffix(';').rstrip()
+    if not statement:
+        raise ValueError("Query is empty.")
+    return f"{statement}\n/\n"
+
+
+def _bind_variables_script(binds: Dict[str, Any]) -> str:
+    """
+    Builds the SQL*Plus commands that declare the given bind variables and set their
+    values with VARIABLE name type = value (SQL*Plus 12.2+, like SET MARKUP CSV).
+    The values are assigned by SQL*Plus itself, so no PL/SQL block has to be parsed
+    by Oracle for each new set of values.
+
+    Args:
+        binds (Dict[str, Any]): Bind names (without the leading ':') mapped to values.
+
+    Returns:
+        str: One VARIABLE command per bind, newline-terminated.
+
+    Raises:
+        ValueError: If a string value contains a line break, which a single-line
+                    VARIABLE command cannot carry.
+    """
+    commands = []
+    for name, value in binds.items():
+        if isinstance(value, bool):
+            commands.append(f"VARIABLE {name} NUMBER = {int(value)}")
+        elif isinstance(value, (int, float, decimal.Decimal)):
+            commands.append(f"VARIABLE {name} NUMBER = {value}")
+        else:
+            text = str(value)
+            if '\n' in text or '\r' in text:
+                raise ValueError(f"Bind variable '{name}' contains a line break and cannot be set in SQL*Plus.")
+            text = text.replace("'", "''")
+            commands.append(f"VARIABLE {name} VARCHAR2(4000) = '{text}'")
+    return "\n".join(commands) + "\n"
 
-# Configure logging
-from config import LOG_LEVEL
-logging.basicConfig(level=LOG_LEVEL, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class DatabaseConnection:
     """
     A class to manage Oracle database connections by invoking sqlplus as a subprocess.
     This bypasses direct Python driver connections, leveraging a pre-configured sqlplus environment.
+    One sqlplus process is kept alive per connection and reused for every query.
     """
 
     def __init__(self, user: str, password: str, dsn: str, sqlplus_path: str = 'sqlplus'):
@@ -30,139 +133,336 @@ class DatabaseConnection:
         self.dsn = dsn
         self.sqlplus_path = sqlplus_path
         self.connection_string = f"{self.user}/{self.password}@{self.dsn}"
-        logging.info(f"DatabaseConnection initialized for SQL*Plus path: {sqlplus_path}, DSN: {dsn}")
+        self._process = None # Persistent sqlplus session, started on first query
+        self._stdin = None
+        self._stdout = None
+        self._stderr = None # Temporary file collecting the session's stderr
+        # Guards the session state. It is never held while a query's output is being
+        # consumed, and is reentrant because an abandoned query generator may be
+        # finalized (and take it) while this thread already holds it.
+        self._lock = threading.RLock()
+        # Signalled whenever the session stops being busy; queries from other
+        # threads wait on it, so one query runs at a time per connection
+        self._idle = threading.Condition(self._lock)
+        self._busy = False # True while the last query's output has not been fully read
+        self._busy_thread = None # Ident of the thread that started the busy query
+        # Printed after each query to find where its output ends
+        self._end_marker = f"__END_OF_QUERY_{uuid.uuid4().hex}__"
+        logger.info("DatabaseConnection initialized for SQL*Plus path: %s, DSN: %s", sqlplus_path, dsn)
 
     def connect(self):
         """
         In this subprocess-based approach, 'connect' primarily checks if sqlplus is available.
-        A real connection is established with each query execution.
+        The sqlplus session itself is started by the first query execution.
         """
         try:
             # Check if sqlplus executable is available
             subprocess.run([self.sqlplus_path, '-V'], check=True, capture_output=True, text=True)
-            logging.info(f"sqlplus executable found at '{self.sqlplus_path}'.")
+            logger.info("sqlplus executable found at '%s'.", self.sqlplus_path)
             return True
         except FileNotFoundError:
-            logging.error(f"sqlplus executable not found at '{self.sqlplus_path}'. "
-                          "Please ensure it's in your system's PATH or provide the full path.")
+            logger.error("sqlplus executable not found at '%s'. "
+                         "Please ensure it's in your system's PATH or provide the full path.", self.sqlplus_path)
             raise
         except subprocess.CalledProcessError as e:
-            logging.error(f"Error checking sqlplus version: {e.stderr.strip()}")
+            logger.error("Error checking sqlplus version: %s", e.stderr.strip())
             raise
         except Exception as e:
-            logging.error(f"An unexpected error occurred while checking sqlplus: {e}")
+            logger.error("An unexpected error occurred while checking sqlplus: %s", e)
             raise
 
     def close(self):
         """
-        No explicit connection to close for sqlplus subprocess calls,
-        as each call is independent. This method is here for interface consistency.
+        Ends the persistent sqlplus session, if one was started, by sending EXIT
+        and waiting for the process to finish. A session whose last query output
+        was not fully read (e.g. the caller stopped on an error) is killed instead.
         """
-        logging.info("No explicit sqlplus connection to close (subprocess mode).")
+        with self._lock:
+            if self._process is None:
+                logger.info("No sqlplus session to close.")
+                return
+            self._stop_session(graceful=not self._busy)
+        logger.info("sqlplus session closed.")
 
-    def execute_query(self, query: str) -> str:
+    def _start_session(self):
+        """
+        Spawns the long-lived sqlplus process and applies the CSV output settings once.
+
+        Raises:
+            FileNotFoundError: If the sqlplus executable cannot be found.
+            Exception: For other unexpected errors while starting sqlplus.
+        """
+        command = [self.sqlplus_path, '-S', self.connection_string] # -S for silent mode
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Running sqlplus command: %s", ' '.join(command))
+
+        # stderr goes to a file rather than a pipe: it is only read once sqlplus has
+        # exited, and a pipe nobody drains would fill up and stall sqlplus mid-query
+        stderr_file = tempfile.TemporaryFile()
+        try:
+            process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                bufsize=SQLPLUS_PIPE_BUFFER_SIZE # Binary pipes; wrapped for text below
+            )
+        except FileNotFoundError:
+            stderr_file.close()
+            logger.error("sqlplus executable not found at '%s'. Ensure it's in PATH.", self.sqlplus_path)
+            raise
+        except Exception as e:
+            stderr_file.close()
+            logger.error("An unexpected error occurred while starting sqlplus: %s", e)
+            raise
+
+        # Same encoding text=True would pick, but without its universal-newline
+        # translation pass: csv expects newline='' so quoted line breaks survive.
+        encoding = locale.getpreferredencoding(False)
+        self._stdin = io.TextIOWrapper(process.stdin, encoding=encoding)
+        self._stdout = io.TextIOWrapper(process.stdout, encoding=encoding, newline='')
+        self._stderr = stderr_file
+        self._process = process
+
+        try:
+            self._stdin.write("\n".join(SQLPLUS_SESSION_SETTINGS) + "\n")
+            self._stdin.flush()
+        except BrokenPipeError:
+            # sqlplus exited right away (e.g. bad credentials); the first query reports it
+            pass
+        logger.info("Started persistent sqlplus session.")
+
+    def _stop_session(self, graceful: bool):
+        """
+        Stops the sqlplus process. A graceful stop sends EXIT and waits for sqlplus
+        to log off; otherwise the process is killed straight away.
         """
-        Executes a SQL query against the database using sqlplus subprocess.
+        process = self._process
+        self._process = None
+        self._busy = False
+        self._idle.notify_all()
+
+        if graceful:
+            try:
+                self._stdin.write("EXIT;\n")
+                self._stdin.close()
+            except (BrokenPipeError, ValueError):
+                pass
+            try:
+                process.wait(timeout=SQLPLUS_EXIT_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                logger.warning("sqlplus did not exit in time. Killing it.")
+
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        for stream in (process.stdin, process.stdout, self._stderr):
+            try:
+                stream.close()
+            except (BrokenPipeError, ValueError):
+                pass
+
+    def _session_failure(self, process: subprocess.Popen, stderr_file) -> ValueError:
+        """
+        Waits for a sqlplus process that closed its output early, logs its exit code
+        and stderr, and returns the error to raise for it.
+        """
+        returncode = process.wait()
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode(errors='replace').strip()
+        logger.error("SQL*Plus session ended unexpectedly with error code %s.", returncode)
+        logger.error("STDERR: %s", stderr)
+        return ValueError(f"SQL*Plus execution error: {stderr or f'exit code {returncode}'}")
+
+    def _set_bind_variables(self, binds: Dict[str, Any]):
+        """
+        Declares and sets the bind variables in the session, then reads the SQL*Plus
+        output up to the end marker, so that a rejected value (e.g. SP2-0631 for a
+        string that is too long) is reported before the query runs instead of ending
+        up in front of its CSV header. The caller must hold the session lock.
+
+        Raises:
+            ValueError: If SQL*Plus rejects a bind variable or exits.
+        """
+        script = _bind_variables_script(binds) + f"PROMPT {self._end_marker}\n"
+        logger.debug("Setting bind variables: %s", script)
+        try:
+            self._stdin.write(script)
+            self._stdin.flush()
+        except BrokenPipeError:
+            pass # Reported as EOF below
+
+        errors = []
+        for line in self._stdout:
+            line = line.strip()
+            if line == self._end_marker:
+                break
+            if line:
+                errors.append(line)
+        else:
+            error = self._session_failure(self._process, self._stderr)
+            self._stop_session(graceful=False)
+            raise error
+
+        if errors:
+            message = " ".join(errors)
+            logger.error("SQL*Plus rejected the bind variables: %s", message)
+            raise ValueError(f"SQL*Plus could not set the bind variables: {message}")
+
+    def execute_query(self, query: str, binds: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        Executes a SQL query against the database through the persistent sqlplus
+        session and streams the raw CSV output back line by line as sqlplus produces it.
+        The session is started on first use and reused by later queries, so the
+        sqlplus start-up and login cost is paid only once.
+        Queries run one at a time: a call from another thread waits until this
+        output has been read or the generator closed, while a new query from the
+        same thread discards the unread rest of this one.
 
         Args:
             query (str): The SQL query string to execute.
                          Note: Bind parameters are handled by sqlplus internally,
                          but the query itself must be self-contained for sqlplus.
+                         It is always ended with a '/' line, so a trailing ';' or '/'
+                         is optional; PL/SQL blocks keep their final 'END;'.
+            binds (Optional[Dict[str, Any]]): Values for the :name bind variables used in
+                         the query (e.g. from QueryBuilder(use_bind_variables=True)).
+                         They are set in the session before the query runs, which
+                         does not start if SQL*Plus rejects any of them.
 
-        Returns:
-            str: The raw CSV output from sqlplus, including column headers.
-                 Returns an empty string if the query fails or returns no data.
+        Yields:
+            str: Lines of the raw CSV output from sqlplus, including column headers.
+                 Feed them to DataProcessor.iter_rows() to get row dictionaries.
 
         Raises:
-            subprocess.CalledProcessError: If the sqlplus command returns a non-zero exit code.
+            ValueError: If a bind variable cannot be set, if sqlplus exits before the
+                        query output is complete, or if the session is closed (by
+                        close() or a newer query) before it is read.
             Exception: For other unexpected errors during subprocess execution.
         """
-        # SQL*Plus commands to format output as CSV with headers
-        # SET MARKUP CSV ON is for Oracle 12.2+
-        # SET PAGESIZE 0: No pagination
-        # SET FEEDBACK OFF: No "X rows selected" message
-        # SET HEADING ON: Keep column headers (needed for CSV parsing)
-        # SET TERMOUT ON, SET TRIMSPOOL ON: Standard for clean output
-        # LINESIZE 32767: Max line size to prevent wrapping
-        sqlplus_commands = [
-            "SET PAGESIZE 0",
-            "SET FEEDBACK OFF",
-            "SET HEADING ON",
-            "SET TERMOUT ON",
-            "SET TRIMSPOOL ON",
-            "SET LINESIZE 32767",
-            "SET MARKUP CSV ON", # Crucial for CSV output
-            query,
-            "EXIT;" # Ensure sqlplus exits after the query
-        ]
-        
-        # Combine commands into a single string to be piped to sqlplus
-        sqlplus_input = "\n".join(sqlplus_commands)
+        statement = _terminate_statement(query)
 
-        command = [self.sqlplus_path, '-S', self.connection_string] # -S for silent mode
+        with self._idle:
+            # Queries from other threads wait until the running one's output has been
+            # read (or its generator closed). A busy session left by this same thread
+            # can never be finished by waiting, so its unread output is discarded.
+            while self._busy and self._busy_thread != threading.get_ident():
+                self._idle.wait()
+            if self._busy and self._process is not None:
+                logger.warning("Previous query output was not fully read. Restarting the sqlplus session.")
+                self._stop_session(graceful=False)
+            if self._process is None or self._process.poll() is not None:
+                if self._process is not None:
+                    self._stop_session(graceful=False)
+                self._start_session()
+
+            if binds:
+                self._set_bind_variables(binds)
 
-        logging.debug(f"Running sqlplus command: {' '.join(command)}")
-        logging.debug(f"Piping SQL: {sqlplus_input}")
+            script = f"{statement}PROMPT {self._end_marker}\n"
+            logger.debug("Piping SQL: %s", script)
 
+            try:
+                # PROMPT echoes the marker once the query output is complete
+                self._stdin.write(script)
+                self._stdin.flush()
+            except BrokenPipeError:
+                # sqlplus has exited; reading stdout below hits EOF and reports it
+                pass
+            process = self._process
+            stdout = self._stdout
+            stderr_file = self._stderr
+            self._busy = True
+            self._busy_thread = threading.get_ident()
+
+        # The lock is released while output is yielded, so close() or the next
+        # query never waits on a consumer that stopped iterating
+        finished = False
         try:
-            process = subprocess.run(
-                command,
-                input=sqlplus_input,
-                capture_output=True,
-                text=True, # Decode stdout/stderr as text
-                check=True # Raise CalledProcessError if return code is non-zero
-            )
-            logging.info("sqlplus query executed successfully.")
-            
-            # The output will contain the CSV data.
-            # We filter out any leading non-CSV lines (e.g., connection banners if -S isn't fully silent or errors)
-            # This is a basic filter; more robust parsing might be needed for complex banners.
-            # For SET MARKUP CSV ON, the first line is usually the headers.
-            output_lines = process.stdout.strip().splitlines()
-            
-            # Find the first line that looks like a CSV header (usually all uppercase for column names)
-            # Or assume the first non-empty line after sqlplus setup is the header if SET HEADING ON
-            
-            # A more robust check might be needed for actual CSV content start.
-            # For simplicity, we'll return the whole stdout and let DataProcessor handle it.
-            return process.stdout.strip()
-            
-        except subprocess.CalledProcessError as e:
-            logging.error(f"SQL*Plus command failed with error code {e.returncode}.")
-            logging.error(f"STDOUT: {e.stdout.strip()}")
-            logging.error(f"STDERR: {e.stderr.strip()}")
-            raise ValueError(f"SQL*Plus execution error: {e.stderr.strip() or e.stdout.strip()}") from e
-        except FileNotFoundError:
-            logging.error(f"sqlplus executable not found at '{self.sqlplus_path}'. Ensure it's in PATH.")
-            raise
-        except Exception as e:
-            logging.error(f"An unexpected error occurred during sqlplus execution: {e}")
-            raise
+            try:
+                for line in stdout:
+                    if line.strip() == self._end_marker:
+                        finished = True
+                        break
+                    yield line
+            except ValueError:
+                # The pipe was closed under us; only expected if the session was stopped
+                if process is self._process:
+                    raise
+
+            if not finished:
+                if process is not self._process:
+                    raise ValueError("The sqlplus session was closed before the query output was read.")
+                raise self._session_failure(process, stderr_file)
+        finally:
+            with self._lock:
+                if process is self._process:
+                    self._busy = False
+                    self._idle.notify_all()
+                    # Output the caller did not consume would leak into the next query's
+                    # results, so a session that did not reach the marker is discarded
+                    if not finished:
+                        self._stop_session(graceful=False)
+
+        logger.info("sqlplus query executed successfully.")
 
 # Example usage (for testing purposes, not part of main execution flow)
 if __name__ == '__main__':
+    from config import LOG_LEVEL
+    logging.basicConfig(level=LOG_LEVEL, format='%(asctime)s - %(levelname)s - %(message)s')
+
     # WARNING: This test block directly calls sqlplus.
-    # Ensure sqlplus is in your PATH or update the sqlplus_path argument.
+    # Ensure sqlplus is in your PATH or set SQLPLUS_PATH to its full path.
     # Set environment variables DB_USER, DB_PASS, DB_DSN before running.
+    # Without a database, SQLPLUS_PATH=./fake_sqlplus.py runs the same checks.
     
     # For a real test, replace with your actual DB details
     test_user = os.getenv("DB_USER", "system")
     test_pass = os.getenv("DB_PASS", "oracle")
     test_dsn = os.getenv("DB_DSN", "localhost:1521/XEPDB1")
+    test_sqlplus = os.getenv("SQLPLUS_PATH", "sqlplus")
+    many_rows_query = "SELECT LEVEL AS N FROM DUAL CONNECT BY LEVEL <= 100000"
 
-    db_conn = DatabaseConnection(test_user, test_pass, test_dsn)
+    db_conn = DatabaseConnection(test_user, test_pass, test_dsn, sqlplus_path=test_sqlplus)
     try:
         db_conn.connect() # Check sqlplus availability
 
         print("\n--- Testing simple SELECT from DUAL ---")
-        csv_output = db_conn.execute_query("SELECT 'Hello from SQL*Plus!' AS MESSAGE FROM DUAL;")
+        csv_output = "".join(db_conn.execute_query("SELECT 'Hello from SQL*Plus!' AS MESSAGE FROM DUAL;"))
         print("Raw CSV Output:\n", csv_output)
 
-        print("\n--- Testing invalid query ---")
+        print("\n--- Testing invalid query (same session; ORA- error is part of the output) ---")
+        csv_output = "".join(db_conn.execute_query("SELECT NON_EXISTENT_COLUMN FROM DUAL;"))
+        print("Raw CSV Output:\n", csv_output)
+
+        print("\n--- Testing an abandoned query (its session is discarded, the next query still works) ---")
+        abandoned = db_conn.execute_query(many_rows_query)
+        print("First lines:", next(abandoned).strip(), next(abandoned).strip())
+        csv_output = "".join(db_conn.execute_query("SELECT 'After abandoned query' AS MESSAGE FROM DUAL"))
+        print("Raw CSV Output:\n", csv_output)
+        try:
+            next(abandoned)
+        except ValueError as e:
+            print("Resuming the abandoned query raised as expected:", e)
+
+        print("\n--- Testing sqlplus crashing mid-query (reported, then a new session is started) ---")
+        crashing = db_conn.execute_query(many_rows_query)
+        next(crashing)
+        db_conn._process.kill()
         try:
-            db_conn.execute_query("SELECT NON_EXISTENT_COLUMN FROM DUAL;")
-        except ValueError as ve:
-            print(f"Caught expected error: {ve}")
+            for _ in crashing:
+                pass
+            print("UNEXPECTED: the query finished although sqlplus was killed")
+        except ValueError as e:
+            print("Crash reported as expected:", e)
+        csv_output = "".join(db_conn.execute_query("SELECT 'After crash' AS MESSAGE FROM DUAL"))
+        print("Raw CSV Output:\n", csv_output)
+
+        print("\n--- Testing a query after close() (a new session is started) ---")
+        db_conn.close()
+        csv_output = "".join(db_conn.execute_query("SELECT 'After close' AS MESSAGE FROM DUAL"))
+        print("Raw CSV Output:\n", csv_output)
 
     except Exception as e:
         print(f"Failed to run db_connector test due to: {e}")
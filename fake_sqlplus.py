@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# fake_sqlplus.py
+#
+# A stand-in for the sqlplus executable, for exercising DatabaseConnection without
+# an Oracle database:
+#
+#     SQLPLUS_PATH=./fake_sqlplus.py python db_connector.py
+#
+# It follows the parts of the SQL*Plus input protocol that DatabaseConnection uses
+# (SET and VARIABLE commands, PROMPT, statements ended by ';' or a '/' line, PL/SQL
+# blocks ended only by '/', EXIT) and answers every statement with CSV rows:
+#   - "... CONNECT BY LEVEL <= N" prints N rows of a single column N
+#   - a statement naming NON_EXISTENT_COLUMN prints an ORA-00904 error
+#   - any other statement prints a one-row MESSAGE result
+
+import re
+import sys
+
+_PLSQL_BLOCK_RE = re.compile(r'\s*(DECLARE|BEGIN)\b', re.IGNORECASE)
+_VARIABLE_RE = re.compile(r"VARIABLE\s+(\w+)\s+(\w+(?:\(\d+\))?)(?:\s*=\s*(.*))?$", re.IGNORECASE)
+_ROWS_RE = re.compile(r'CONNECT\s+BY\s+LEVEL\s*<=\s*(\d+)', re.IGNORECASE)
+
+
+def run_statement(statement):
+    if 'NON_EXISTENT_COLUMN' in statement.upper():
+        print('ERROR at line 1:\nORA-00904: "NON_EXISTENT_COLUMN": invalid identifier')
+    elif _ROWS_RE.search(statement):
+        print('"N"')
+        for n in range(1, int(_ROWS_RE.search(statement).group(1)) + 1):
+            print(f'{n}')
+    else:
+        print('"MESSAGE"\n"Hello from fake SQL*Plus!"')
+    sys.stdout.flush()
+
+
+def main():
+    if sys.argv[1:2] == ['-V']:
+        print("SQL*Plus: Release 19.0.0.0.0 - Production (fake)")
+        return 0
+
+    buffer = []
+    for line in sys.stdin:
+        text = line.strip()
+        if not buffer:
+            command = text.upper()
+            if not text or command.startswith('SET '):
+                continue
+            if command.startswith('PROMPT'):
+                print(text[7:], flush=True)
+                continue
+            if command.startswith('VARIABLE '):
+                match = _VARIABLE_RE.match(text)
+                if match is None:
+                    print("SP2-0553: Illegal variable name", flush=True)
+                elif match.group(3) and len(match.group(3)) > 4002: # Quotes included
+                    print(f'SP2-0631: String beginning "{match.group(3)[:20]}..." is too long.', flush=True)
+                continue
+            if command.rstrip(';') == 'EXIT':
+                return 0
+
+        if text == '/':
+            if buffer:
+                run_statement("\n".join(buffer))
+                buffer = []
+            continue
+        buffer.append(text)
+        if text.endswith(';') and not _PLSQL_BLOCK_RE.match(buffer[0]):
+            run_statement("\n".join(buffer))
+            buffer = []
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,20 @@
 # main.py
 
 import argparse
+import contextlib
 import json
 import logging
 import os
-import re # Import regex for parsing SQL*Plus string
+import subprocess
+
+# orjson is optional: it parses the raw file bytes directly and is several times
+# faster than the stdlib json module, which is used when orjson is not installed.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so error handling is shared.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 # Import updated modules
 from db_connector import DatabaseConnection
@@ -12,9 +22,6 @@ from query_builder import QueryBuilder
 from data_processor import DataProcessor
 from config import DB_USER, DB_PASS, DB_DSN, LOG_LEVEL # Import original config values as fallback
 
-# Configure logging for the main script
-logging.basicConfig(level=LOG_LEVEL, format='%(asctime)s - %(levelname)s - %(message)s')
-
 def load_query_config(file_path: str) -> dict:
     """
     Loads the query configuration from a JSON file.
@@ -34,8 +41,9 @@ def load_query_config(file_path: str) -> dict:
         raise FileNotFoundError(f"JSON file not found at '{file_path}'")
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
+        # Read bytes: both parsers decode UTF-8 themselves, skipping the text-mode decode
+        with open(file_path, 'rb') as f:
+            config = _json_loads(f.read())
             logging.info(f"Successfully loaded query configuration from '{file_path}'.")
             return config
     except json.JSONDecodeError as e:
@@ -59,15 +67,15 @@ def parse_sqlplus_connection_string(conn_str: str) -> tuple[str, str, str]:
     Raises:
         ValueError: If the connection string format is invalid.
     """
-    # Regex to match user/pass@dsn format
-    # Group 1: username, Group 2: password, Group 3: dsn
-    match = re.match(r'^([^/]+)/([^@]+)@(.+)$', conn_str)
-    if not match:
+    # Username runs up to the first '/', password up to the next '@', DSN is the rest
+    # (the DSN itself may contain '/', e.g. 'host:port/service_name')
+    username, slash, rest = conn_str.partition('/')
+    password, at, dsn = rest.partition('@')
+    if not (slash and at and username and password and dsn):
         raise ValueError(
             f"Invalid SQL*Plus connection string format. Expected 'user/pass@dsn'. Got: '{conn_str}'"
         )
     
-    username, password, dsn = match.groups()
     logging.info(f"Parsed SQL*Plus string: User='{username}', DSN='{dsn}'")
     return username, password, dsn
 
@@ -76,6 +84,10 @@ def main():
     Main function to execute the database query tool via sqlplus subprocess.
     Parses arguments, loads config, builds query, executes, and processes results.
     """
+    # Logging is configured here rather than at import time, so importing this
+    # module leaves the root logger alone
+    logging.basicConfig(level=LOG_LEVEL, format='%(asctime)s - %(levelname)s - %(message)s')
+
     parser = argparse.ArgumentParser(
         description="Connects to an Oracle DB via sqlplus subprocess, builds a SQL query from a JSON config, and fetches data."
     )
@@ -96,6 +108,12 @@ def main():
         help="Optional: The full path to the sqlplus executable (e.g., '/usr/bin/sqlplus'). Defaults to 'sqlplus' (assumes it's in PATH)."
     )
 
+    parser.add_argument(
+        "--bind-variables",
+        action="store_true",
+        help="Optional: Pass filter values as bind variables instead of inlining them as literals, so Oracle can reuse the parsed query across values. Note that string values are then VARCHAR2, which compares without blank-padding against CHAR columns."
+    )
+
     args = parser.parse_args()
     json_file_path = args.json_file
     sqlplus_conn_string = args.sqlplus_string
@@ -128,28 +146,24 @@ def main():
         db_connection.connect() # This now checks sqlplus availability
 
         # 3. Build SQL Query (for direct embedding into sqlplus input)
-        query_builder = QueryBuilder(query_config)
-        sql_query_string, _ = query_builder.build_select_query() # Bind params are not used for sqlplus direct input
-
-        # 4. Execute Query via sqlplus subprocess
-        raw_csv_output = db_connection.execute_query(sql_query_string)
-
-        if raw_csv_output:
-            # 5. Process Results (parse CSV output)
-            results_as_dict = DataProcessor.process_csv_output_to_dict(raw_csv_output)
-            
-            logging.info(f"Query returned {len(results_as_dict)} rows.")
-            
+        query_builder = QueryBuilder(query_config, use_bind_variables=args.bind_variables)
+        sql_query_string, bind_params = query_builder.build_select_query() # Empty unless --bind-variables
+
+        # 4. Execute Query via sqlplus subprocess and 5. Process Results in one pass:
+        # each row is parsed into a dict as soon as sqlplus prints it
+        # closing() ends the query even if the loop stops early, so an unread
+        # session is torn down before db_connection.close() runs
+        with contextlib.closing(db_connection.execute_query(sql_query_string, bind_params)) as csv_lines:
             # Print results (you might want to save to a file or process further)
             print("\n--- Query Results ---")
-            if results_as_dict:
-                for row in results_as_dict:
-                    print(row)
-            else:
-                print("No data found matching the criteria.")
-            
-        else:
-            logging.warning("No raw CSV output received from sqlplus.")
+            row_count = 0
+            for row in DataProcessor.iter_rows(csv_lines):
+                print(row)
+                row_count += 1
+
+        if not row_count:
+            print("No data found matching the criteria.")
+        logging.info(f"Query returned {row_count} rows.")
 
     except FileNotFoundError as e:
         print(f"ERROR: {e}")
@@ -1,13 +1,90 @@
+import functools
 import logging
-from typing import Dict, List, Any, Tuple
+import sys
+from typing import Dict, Iterator, List, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SQ = "'"
+_SQ2 = "''"
+# SQL literals for False/True, indexed by the bool itself
+_BOOL_SQL = ("0", "1")
+
+# Canonical upper-case spelling of the common filter operators, keyed by their upper-
+# and lower-case forms, so that these skip the str.upper() allocation. The canonical
+# strings are interned, so the _OP_HANDLERS lookup and the ASC/DESC membership test
+# find them by identity without comparing characters.
+_COMMON_OPERATORS = tuple(map(sys.intern, ("=", "!=", "<>", "<", ">", "<=", ">=", "LIKE", "NOT LIKE",
+                                           "IN", "BETWEEN", "IS NULL", "IS NOT NULL")))
+_OP_CANON = {spelling: op for op in _COMMON_OPERATORS for spelling in (op, op.lower())}
+# Same for the group operators and sort directions
+_KEYWORDS = tuple(map(sys.intern, ("AND", "OR", "ASC", "DESC")))
+_KEYWORD_CANON = {spelling: kw for kw in _KEYWORDS for spelling in (kw, kw.lower())}
+_ORDER_DIRECTIONS = frozenset(map(sys.intern, ("ASC", "DESC")))
+
+# Marks the end of a condition list while walking nested filter groups
+_END_OF_GROUP = object()
+
+
+def _quote_sql_string(value: str) -> str:
+    # Most values contain no quote: the membership test is a single C-level scan,
+    # and then the value is used as-is without a replace() call or copy
+    if _SQ not in value:
+        return f"'{value}'"
+    return f"'{value.replace(_SQ, _SQ2)}'"
+
+
+# Literal formatters for the value types JSON produces, keyed by exact type, so one
+# dict lookup replaces the isinstance() chain. type(True) is bool, so booleans never
+# reach the int entry.
+_LITERAL_FORMATTERS = {
+    str: _quote_sql_string,
+    type(None): lambda value: "NULL",
+    bool: _BOOL_SQL.__getitem__,
+    int: str,
+    float: str,
+}
+
+
+# Identifiers repeat across SELECT, WHERE and ORDER BY, and across builds of the
+# same config, so each distinct one is checked (and warned about) only once. The
+# cache also hands back one shared string object per identifier.
+@functools.lru_cache(maxsize=1024)
+def _sanitize_identifier(identifier: str) -> str:
+    # Unquoted identifiers are expected to be plain ASCII letters, digits and
+    # underscores, not starting with a digit. Both checks are single C-level scans;
+    # isascii() is needed because isidentifier() also accepts non-ASCII letters.
+    if not (identifier.isascii() and identifier.isidentifier()):
+        logger.warning("Identifier '%s' contains non-alphanumeric characters or underscores. "
+                       "Consider if it needs double quotes in Oracle, e.g., \"%s\". "
+                       "Basic sanitization applied.", identifier, identifier)
+    return identifier
+
+
+class _GroupFrame:
+    # One condition group being walked by QueryBuilder._build_condition_group
+    __slots__ = ("conditions", "separator", "emitted", "mark")
+
+    def __init__(self, conditions: List[Dict[str, Any]], operator: str, mark: int):
+        self.conditions: Iterator[Dict[str, Any]] = iter(conditions)
+        self.separator = f" {operator} " # Placed between the group's conditions
+        self.emitted = False # Whether any condition of the group has been emitted
+        self.mark = mark # parts length before the group's separator and "("
 
-logging.basicConfig(level='INFO', format='%(asctime)s - %(levelname)s - %(message)s')
 
 class QueryBuilder:
-    def __init__(self, query_config: Dict[str, Any]):
+    def __init__(self, query_config: Dict[str, Any], use_bind_variables: bool = False):
+        # use_bind_variables: emit :b0, :b1, ... placeholders instead of inlining filter
+        # values and return the values as binds from build_select_query(). The SQL text
+        # then stays the same for every value, so Oracle can reuse the parsed cursor.
         self.config = query_config
+        self.use_bind_variables = use_bind_variables
         self._validate_config()
-        logging.info("QueryBuilder initialized with configuration.")
+        # The config is not modified after construction, so the whole query is
+        # rendered once here and build_select_query() just returns it
+        self._binds: Dict[str, Any] = {}
+        self._query = self._render_query()
+        logger.info("QueryBuilder initialized with configuration.")
 
     def _validate_config(self):
         if "table" not in self.config or not self.config["table"]:
@@ -15,138 +92,189 @@ class QueryBuilder:
         if "columns" not in self.config or not isinstance(self.config["columns"], list):
             raise ValueError("Query configuration must specify 'columns' as a list.")
         if not self.config["columns"]:
-             logging.warning("No columns specified. Query will select all columns (*).")
+             logger.warning("No columns specified. Query will select all columns (*).")
 
-    def _build_select_clause(self) -> str:
+    # The _build_* helpers append SQL fragments to a shared parts list instead of
+    # returning formatted substrings; the caller joins the list once at the end.
+    # Every clause after SELECT starts with its own "\n" separator.
+
+    def _build_select_clause(self, parts: List[str]) -> None:
         columns = self.config.get("columns")
+        parts.append("SELECT ")
         if not columns:
-            return "*"
-        return ", ".join([self._sanitize_identifier(col) for col in columns])
-
-    def _build_from_clause(self) -> str:
-        table = self._sanitize_identifier(self.config["table"])
-        return f"FROM {table}"
-
-    def _sanitize_identifier(self, identifier: str) -> str:
-        if not all(c.isalnum() or c == '_' for c in identifier):
-            logging.warning(f"Identifier '{identifier}' contains non-alphanumeric characters or underscores. "
-                            f"Consider if it needs double quotes in Oracle, e.g., \"{identifier}\". "
-                            "Basic sanitization applied.")
-        return identifier
-    
+            parts.append("*")
+        else:
+            parts.append(", ".join(map(_sanitize_identifier, columns)))
+
+    def _build_from_clause(self, parts: List[str]) -> None:
+        parts.extend(("\nFROM ", _sanitize_identifier(self.config["table"])))
+
     def _format_value_for_sql(self, value: Any) -> str:
+        formatter = _LITERAL_FORMATTERS.get(type(value))
+        if formatter is not None:
+            return formatter(value)
+        # Subclasses of the builtin types (and anything else) take the isinstance path
         if isinstance(value, str):
-            return f"'{value.replace(\"'\", \"''\")}'"
+            return _quote_sql_string(value)
         elif value is None:
             return "NULL"
         elif isinstance(value, bool):
-            return "1" if value else "0"
+            return _BOOL_SQL[value]
         else:
             return str(value)
 
-    def _build_single_condition(self, condition: Dict[str, Any]) -> str:
-        column = self._sanitize_identifier(condition["column"])
-        operator = condition["operator"].upper()
+    def _format_operand(self, value: Any) -> str:
+        # With bind variables every value except NULL becomes a :bN placeholder and
+        # is recorded in the binds that build_select_query() returns
+        if not self.use_bind_variables or value is None:
+            return self._format_value_for_sql(value)
+        name = f"b{len(self._binds)}"
+        self._binds[name] = value
+        return f":{name}"
+
+    def _format_in_condition(self, parts: List[str], column: str, operator: str, value: Any) -> None:
+        if not isinstance(value, list) or not value:
+            raise ValueError(f"Filter for column '{column}' with 'IN' operator requires a non-empty list value.")
+        parts.extend((column, " IN (", self._format_in_values(value), ")"))
+
+    def _format_in_values(self, values: List[Any]) -> str:
+        # Long IN lists usually hold values of a single type. Inlined int/float and
+        # str lists are then joined in one C-level pass instead of a formatter call
+        # per value; mixed lists and bind variables go value by value.
+        if not self.use_bind_variables:
+            kinds = set(map(type, values))
+            if len(kinds) == 1:
+                kind = kinds.pop()
+                if kind is int or kind is float:
+                    return ", ".join(map(str, values))
+                if kind is str:
+                    joined = "', '".join(values)
+                    # Only the separators contain quotes, so no value needs escaping
+                    if joined.count(_SQ) == 2 * (len(values) - 1):
+                        return f"'{joined}'"
+                    return ", ".join(map(_quote_sql_string, values))
+        return ", ".join(map(self._format_operand, values))
+
+    def _format_between_condition(self, parts: List[str], column: str, operator: str, value: Any) -> None:
+        if not isinstance(value, list) or len(value) != 2:
+            raise ValueError(f"Filter for column '{column}' with 'BETWEEN' operator requires a list of two values.")
+        parts.extend((column, " BETWEEN ", self._format_operand(value[0]),
+                      " AND ", self._format_operand(value[1])))
+
+    def _format_null_condition(self, parts: List[str], column: str, operator: str, value: Any) -> None:
+        parts.extend((column, " ", operator))
+
+    # Operators needing special SQL; every other operator is a plain "column op value" comparison
+    _OP_HANDLERS = {
+        sys.intern("IN"): _format_in_condition,
+        sys.intern("BETWEEN"): _format_between_condition,
+        sys.intern("IS NULL"): _format_null_condition,
+        sys.intern("IS NOT NULL"): _format_null_condition,
+    }
+
+    def _build_single_condition(self, parts: List[str], condition: Dict[str, Any]) -> None:
+        column = _sanitize_identifier(condition["column"])
+        raw_operator = condition["operator"]
+        operator = _OP_CANON.get(raw_operator) or raw_operator.upper()
         value = condition.get("value")
 
-        if operator == "IN":
-            if not isinstance(value, list) or not value:
-                raise ValueError(f"Filter for column '{column}' with 'IN' operator requires a non-empty list value.")
-            formatted_values = [self._format_value_for_sql(item) for item in value]
-            return f"{column} IN ({', '.join(formatted_values)})"
-        elif operator == "BETWEEN":
-            if not isinstance(value, list) or len(value) != 2:
-                raise ValueError(f"Filter for column '{column}' with 'BETWEEN' operator requires a list of two values.")
-            val1 = self._format_value_for_sql(value[0])
-            val2 = self._format_value_for_sql(value[1])
-            return f"{column} BETWEEN {val1} AND {val2}"
-        elif operator in ["IS NULL", "IS NOT NULL"]:
-            return f"{column} {operator}"
+        handler = self._OP_HANDLERS.get(operator)
+        if handler is not None:
+            handler(self, parts, column, operator, value)
         else:
-            formatted_value = self._format_value_for_sql(value)
-            return f"{column} {operator} {formatted_value}"
+            parts.extend((column, " ", operator, " ", self._format_operand(value)))
+
+    def _build_condition_group(self, parts: List[str], conditions_list: List[Dict[str, Any]],
+                               default_operator: str = "AND") -> bool:
+        # Returns whether any condition was emitted; empty groups leave parts untouched.
+        # Nested groups are walked with an explicit stack of _GroupFrame rather than
+        # recursion; an empty nested group is rolled back to its mark when popped.
+        stack = [_GroupFrame(conditions_list, default_operator, len(parts))]
 
-    def _build_condition_group(self, conditions_list: List[Dict[str, Any]], default_operator: str = "AND") -> str:
-        group_conditions = []
-        operator_to_use = default_operator
+        while True:
+            frame = stack[-1]
+            item: Any = next(frame.conditions, _END_OF_GROUP)
 
-        for item in conditions_list:
-            if "logical_operator" in item and "conditions" in item:
-                nested_operator = item["logical_operator"].upper()
+            if item is _END_OF_GROUP:
+                stack.pop()
+                if not stack:
+                    return frame.emitted
+                if frame.emitted:
+                    parts.append(")")
+                    stack[-1].emitted = True
+                else:
+                    del parts[frame.mark:]
+            elif "logical_operator" in item and "conditions" in item:
+                raw_operator = item["logical_operator"]
+                nested_operator = _KEYWORD_CANON.get(raw_operator) or raw_operator.upper()
                 nested_conditions = item["conditions"]
                 if not nested_conditions:
-                    logging.warning(f"Empty condition list for logical group with operator '{nested_operator}'. Skipping.")
+                    logger.warning("Empty condition list for logical group with operator '%s'. Skipping.", nested_operator)
                     continue
-                
-                nested_group_sql = self._build_condition_group(nested_conditions, nested_operator)
-                if nested_group_sql:
-                    group_conditions.append(f"({nested_group_sql})")
+
+                mark = len(parts)
+                if frame.emitted:
+                    parts.append(frame.separator)
+                parts.append("(")
+                stack.append(_GroupFrame(nested_conditions, nested_operator, mark))
             elif "column" in item and "operator" in item:
-                group_conditions.append(self._build_single_condition(item))
+                if frame.emitted:
+                    parts.append(frame.separator)
+                self._build_single_condition(parts, item)
+                frame.emitted = True
             else:
-                logging.warning(f"Unrecognized filter structure: {item}. Skipping.")
-        
-        if not group_conditions:
-            return ""
-
-        return f" {operator_to_use} ".join(group_conditions)
+                logger.warning("Unrecognized filter structure: %s. Skipping.", item)
 
-
-    def _build_where_clause(self) -> str:
-        filters = self.config.get("filters", [])
+    def _build_where_clause(self, parts: List[str]) -> None:
+        filters = self.config.get("filters")
         if not filters:
-            return ""
-
-        where_sql = self._build_condition_group(filters, "AND")
-        return f"WHERE {where_sql}" if where_sql else ""
+            return
 
+        mark = len(parts)
+        parts.append("\nWHERE ")
+        if not self._build_condition_group(parts, filters, "AND"):
+            del parts[mark:]
 
-    def _build_order_by_clause(self) -> str:
-        order_by_config = self.config.get("order_by", [])
+    def _build_order_by_clause(self, parts: List[str]) -> None:
+        order_by_config = self.config.get("order_by")
         if not order_by_config:
-            return ""
-
-        orders = []
-        for item in order_by_config:
-            column = self._sanitize_identifier(item["column"])
-            direction = item.get("direction", "ASC").upper()
-            if direction not in ["ASC", "DESC"]:
-                logging.warning(f"Invalid order direction '{direction}' for column '{column}'. Defaulting to ASC.")
-                direction = "ASC"
-            orders.append(f"{column} {direction}")
+            return
 
-        return "ORDER BY " + ", ".join(orders)
+        parts.append("\nORDER BY ")
+        for index, item in enumerate(order_by_config):
+            column = _sanitize_identifier(item["column"])
+            raw_direction = item.get("direction", "ASC")
+            direction = _KEYWORD_CANON.get(raw_direction) or raw_direction.upper()
+            if direction not in _ORDER_DIRECTIONS:
+                logger.warning("Invalid order direction '%s' for column '%s'. Defaulting to ASC.", direction, column)
+                direction = "ASC"
+            if index:
+                parts.append(", ")
+            parts.extend((column, " ", direction))
 
-    def _build_limit_clause(self) -> str:
+    def _build_limit_clause(self, parts: List[str]) -> None:
         limit = self.config.get("limit")
         if limit is None or not isinstance(limit, int) or limit <= 0:
-            return ""
-        return f"FETCH NEXT {limit} ROWS ONLY"
+            return
+        parts.extend(("\nFETCH NEXT ", str(limit), " ROWS ONLY"))
+
+    def _render_query(self) -> str:
+        query_parts: List[str] = []
+        self._build_select_clause(query_parts)
+        self._build_from_clause(query_parts)
+        self._build_where_clause(query_parts)
+        self._build_order_by_clause(query_parts)
+        self._build_limit_clause(query_parts)
+        return "".join(query_parts)
 
     def build_select_query(self) -> Tuple[str, Dict[str, Any]]:
-        select_clause = self._build_select_clause()
-        from_clause = self._build_from_clause()
-        where_clause = self._build_where_clause()
-        order_by_clause = self._build_order_by_clause()
-        limit_clause = self._build_limit_clause()
-
-        query_parts = [
-            f"SELECT {select_clause}",
-            from_clause
-        ]
-
-        if where_clause:
-            query_parts.append(where_clause)
-        if order_by_clause:
-            query_parts.append(order_by_clause)
-        if limit_clause:
-            query_parts.append(limit_clause)
-
-        final_query = "\n".join(query_parts)
-        logging.info(f"Constructed SQL Query for SQL*Plus:\n{final_query}")
-        return final_query, {}
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Constructed SQL Query for SQL*Plus:\n%s", self._query)
+        return self._query, dict(self._binds)
 
 if __name__ == '__main__':
+    logging.basicConfig(level='INFO', format='%(asctime)s - %(levelname)s - %(message)s')
+
     image_like_config = {
         "table": "netcool.reporter_status_1",
         "columns": [